@@ -0,0 +1,15 @@
+"""Gunicorn configuration for the RSS merger.
+
+The gthread worker model pairs with the app's blocking-I/O fetch paths:
+each worker thread parks cheaply while waiting on upstream feeds, so
+workers * threads requests can be in flight at once. Job state and the
+generated feeds live on shared disk, so polls may land on any worker.
+"""
+import multiprocessing
+
+bind = '0.0.0.0:5000'
+workers = 2 * multiprocessing.cpu_count() + 1
+threads = 16
+worker_class = 'gthread'
+timeout = 30
+keepalive = 5